@@ -1,51 +1,47 @@
-from flask import Flask, render_template, abort
-from fauxsnow import ResortModel, ForecastAPILoader, ForecastModel
+from flask import Flask, Response, render_template, abort
+from views import broadcaster
+import views, queue
 
 app = Flask(__name__)
  
 view_count = 0
 
-@app.route("/")
-def welcome():
-
-    resort_model = ResortModel()
-    resorts = resort_model.get_all_resorts()
-    return render_template("welcome.html", resorts=resorts)
-
-@app.route("/detail/<text_id>")
-def detail(text_id):
-    try:
-        resort_model = ResortModel()
-        resort = resort_model.get_resort_by_id(text_id)
-        if resort:
-            return render_template("detail.html", resort=resort)
-        else:
-            abort(500)
-    except IndexError:
-        abort(404)
-
-@app.route("/refresh")
-def refresh():
-    rm = ResortModel()
-    fm = ForecastModel()
-    resorts = rm.get_all_resorts()
-    fAPI = ForecastAPILoader()
-    forecasts = fAPI.load_forecasts_from_api(resorts)
-    # if the api call returns None, fail gracefully.
-    message = ''
-    if forecasts:
-        fm.save_forecasts(forecasts)
-        message = 'Updated forecasts'
-    else:
-        message = 'could not update forecasts'
-    return render_template('refresh.html', message=message)
-
-@app.route("/about")
-def about():
-    rm = ResortModel()
-    resorts = rm.get_all_resorts()
-    num_resorts = len(resorts)
-    return render_template("about.html", resorts=resorts, num_resorts=num_resorts)
+def page_view(page):
+    """wrap a page function from views.py in a flask route handler
+
+    Keyword arguments: 
+    page -- function returning (template, context), or None for a 404
+    """
+    def view(**kwargs):
+        rendered = page(**kwargs)
+        if rendered is None:
+            abort(404)
+        template, context = rendered
+        return render_template(template, **context)
+    return view
+
+for rule, page in views.PAGES:
+    app.add_url_rule(rule, page.__name__, page_view(page))
+
+@app.route("/events")
+def events():
+    subscriber = broadcaster.subscribe()
+
+    def stream():
+        try:
+            while True:
+                try:
+                    message = subscriber.get(timeout=views.KEEPALIVE_SECONDS)
+                    # the client fell behind, end the stream so it reconnects
+                    if message is broadcaster.CLOSED:
+                        break
+                    yield views.sse_event(message)
+                except queue.Empty:
+                    yield views.SSE_KEEPALIVE
+        finally:
+            broadcaster.unsubscribe(subscriber)
+
+    return Response(stream(), mimetype='text/event-stream', headers=views.SSE_HEADERS)
 
 @app.errorhandler(404)
 def page_not_found(error):
@@ -54,4 +50,3 @@ def page_not_found(error):
 @app.errorhandler(500)
 def page_not_found(error):
    return render_template('404.html', title = 'Something went wrong'), 500
- 
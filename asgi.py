@@ -0,0 +1,56 @@
+from quart import Quart, render_template, abort
+from views import broadcaster
+import asyncio, views
+
+# async twin of app.py for ASGI servers (uvicorn, hypercorn), serving the
+# same pages from views.py. The models read json files from disk, so they
+# run in the default thread pool to keep the event loop free for other
+# requests.
+app = Quart(__name__)
+
+def page_view(page):
+    """wrap a page function from views.py in an async quart route handler
+
+    Keyword arguments:
+    page -- function returning (template, context), or None for a 404
+    """
+    async def view(**kwargs):
+        rendered = await asyncio.to_thread(page, **kwargs)
+        if rendered is None:
+            abort(404)
+        template, context = rendered
+        return await render_template(template, **context)
+    return view
+
+for rule, page in views.PAGES:
+    app.add_url_rule(rule, page.__name__, page_view(page))
+
+@app.route("/events")
+async def events():
+    subscriber = broadcaster.subscribe_async(asyncio.get_running_loop())
+
+    async def stream():
+        try:
+            while True:
+                try:
+                    message = await asyncio.wait_for(subscriber.get(), views.KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    yield views.SSE_KEEPALIVE.encode()
+                    continue
+                # the client fell behind, end the stream so it reconnects
+                if message is broadcaster.CLOSED:
+                    break
+                yield views.sse_event(message).encode()
+        finally:
+            broadcaster.unsubscribe(subscriber)
+
+    headers = dict(views.SSE_HEADERS, **{'Content-Type': 'text/event-stream'})
+    return stream(), 200, headers
+
+@app.errorhandler(404)
+async def page_not_found(error):
+   return await render_template('404.html', title = '404 Not Found'), 404
+
+@app.errorhandler(500)
+async def server_error(error):
+   return await render_template('404.html', title = 'Something went wrong'), 500
@@ -1,6 +1,6 @@
 from dataclasses import dataclass, field
 from typing import List
-import requests, json, datetime, numpy, os, re
+import requests, json, datetime, numpy, os, re, queue, threading, time, asyncio
 
 
 @dataclass
@@ -209,8 +209,21 @@ class ForecastModel:
         returns a list of all available Forecast objects
     get_forecast_by_resort_id(resort_id)
         returns a Forecast object based on the resort_id
+    diff_forecasts(old_forecasts, new_forecasts)
+        returns the resort/periods whose conditions changed between two lists of Forecasts
+    iter_forecast_rows(resorts, state, conditions)
+        yields one flat dict per resort and forecast period
+    build_rankings(forecasts, resorts)
+        returns the per-day rankings, best bets, streaks and state summaries
+    get_rankings()
+        returns the rankings saved with the last refresh
     """
     FORECASTS_FILE = 'data/forecasts.json'
+    RANKINGS_FILE = 'data/rankings.json'
+    MIN_STREAK_DAYS = 2
+    EXPORT_FIELDS = ['resort_id', 'name', 'state', 'state_short', 'forecast_date', 
+        'date', 'min_temp', 'max_temp', 'snow_in', 'weather', 'weather_coded', 
+        'humidity', 'conditions']
 
     def get_all_forecasts(self, file:str=FORECASTS_FILE) -> list:
         """
@@ -223,7 +236,7 @@ class ForecastModel:
             for forecast_item in forecast_data:
                 forecast = Forecast(
                     forecast_item['resort_id'],
-                    datetime.datetime.now().strftime("%d/%m/%Y %I:%M %p")
+                    forecast_item['forecast_date']
                 )
                 
                 for period in forecast_item['periods']:
@@ -259,31 +272,362 @@ class ForecastModel:
         
         return None
     
-    def save_forecasts(self, forecasts:list):
-        """save the weather forecast json to a text file
+    def save_forecasts(self, forecasts:list, file:str=FORECASTS_FILE, 
+            rankings_file:str=RANKINGS_FILE, resorts_file:str=ResortModel.SKI_RESORTS_FILE):
+        """save the weather forecast json to a text file, along with the 
+        rankings derived from it
         
         Keyword arguments: 
         forecasts -- list of Forecast objects
         """
+        resorts = ResortModel().get_all_resorts(False, resorts_file)
+        rankings = self.build_rankings(forecasts, resorts)
+        with open(rankings_file, 'w') as outfile:
+            json.dump(rankings, outfile, indent=4)
+
         forecasts_output = []
         for forecast in forecasts:
             forecasts_output.append(forecast.to_dict())
 
-        with open(f'data/forecasts.json', 'w') as outfile:
+        with open(file, 'w') as outfile:
             json.dump(forecasts_output, outfile, indent=4)
 
+    def build_rankings(self, forecasts:list, resorts:list) -> dict:
+        """Return the views derived from a forecast snapshot: resorts ranked 
+        per day, the best bet for each day, streaks of consecutive Faux days 
+        and per-state summaries
+        
+        Keyword arguments: 
+        forecasts -- list of Forecast objects
+        resorts -- list of Resort objects, used for names and states
+        """
+        fs = FauxSnow()
+        resorts_by_id = {resort.resort_id: resort for resort in resorts}
+        # a resort that failed to update keeps its last forecast, so only 
+        # rank the days covered by the freshest forecast in the snapshot
+        days = {}
+        if forecasts:
+            freshest = max(forecasts, key=self.forecast_datetime)
+            days = {period.period_date: [] for period in freshest.periods}
+        streaks = []
+        states = {}
 
+        for forecast in forecasts:
+            resort = resorts_by_id.get(forecast.resort_id)
+            if resort is None:
+                continue
 
-class ForecastAPILoader:
+            state = states.setdefault(resort.state_short, {
+                'state': resort.state,
+                'state_short': resort.state_short,
+                'resorts': 0,
+                'faux_days': 0,
+                'snow_days': 0,
+                'best_resort': None,
+                'best_resort_name': None,
+                'best_resort_days': 0
+            })
+            state['resorts'] += 1
+            good_days = 0
+            streak = []
+
+            for period in forecast.periods:
+                if period.period_date not in days:
+                    continue
+                days[period.period_date].append({
+                    'resort_id': resort.resort_id,
+                    'name': resort.name,
+                    'state_short': resort.state_short,
+                    'conditions': period.conditions,
+                    'wet_bulb_margin': fs.calc_wet_bulb_margin(period.min_temp, period.humidity),
+                    'snowmaking_hours': fs.calc_snowmaking_hours(
+                        period.min_temp, period.max_temp, period.humidity)
+                })
+                if period.conditions == 'Faux':
+                    state['faux_days'] += 1
+                    streak.append(period.period_date)
+                else:
+                    if period.conditions == 'Snow':
+                        state['snow_days'] += 1
+                    streaks.extend(self.faux_streak(resort, streak))
+                    streak = []
+                if period.conditions:
+                    good_days += 1
+            streaks.extend(self.faux_streak(resort, streak))
+
+            if good_days > state['best_resort_days']:
+                state['best_resort'] = resort.resort_id
+                state['best_resort_name'] = resort.name
+                state['best_resort_days'] = good_days
+
+        rankings = {'days': [], 'best_bets': [], 'streaks': [], 'states': []}
+        for date, ranked in days.items():
+            ranked.sort(key=lambda r: (r['wet_bulb_margin'], r['snowmaking_hours']), reverse=True)
+            rankings['days'].append({'date': date, 'resorts': ranked})
+            best = next((r for r in ranked if r['conditions']), None)
+            rankings['best_bets'].append({'date': date, 'resort': best})
+        rankings['streaks'] = sorted(streaks, key=lambda s: s['days'], reverse=True)
+        rankings['states'] = sorted(states.values(), key=lambda s: s['state'])
+        return rankings
+
+    def forecast_datetime(self, forecast:Forecast) -> datetime.datetime:
+        """
+        Return when a forecast was retrieved, or datetime.min if the date 
+        can't be parsed.
+        """
+        try:
+            return datetime.datetime.strptime(forecast.forecast_date, "%d/%m/%Y %I:%M %p")
+        except (TypeError, ValueError):
+            return datetime.datetime.min
+
+    def faux_streak(self, resort:Resort, dates:list) -> list:
+        """Return a one item list with the streak of consecutive Faux days, 
+        or an empty list if the streak is too short to count
+        
+        Keyword arguments: 
+        resort -- the Resort the streak belongs to
+        dates -- the period dates in the streak
+        """
+        if len(dates) < self.MIN_STREAK_DAYS:
+            return []
+        return [{
+            'resort_id': resort.resort_id,
+            'name': resort.name,
+            'state_short': resort.state_short,
+            'start': dates[0],
+            'end': dates[-1],
+            'days': len(dates)
+        }]
+
+    def get_rankings(self, file:str=RANKINGS_FILE) -> dict:
+        """
+        Return the rankings saved with the last forecast refresh. If they 
+        have not been saved yet, build and save them from the saved forecasts.
+        """
+        try:
+            with open(file) as rankings_file:
+                return json.load(rankings_file)
+        except FileNotFoundError:
+            resorts = ResortModel().get_all_resorts(False)
+            rankings = self.build_rankings(self.get_all_forecasts(), resorts)
+            with open(file, 'w') as outfile:
+                json.dump(rankings, outfile, indent=4)
+            return rankings
+
+    def iter_forecast_rows(self, resorts:list, state:str=None, conditions:list=None, 
+            file:str=FORECASTS_FILE):
+        """Yield one flat dict per resort and forecast period, in EXPORT_FIELDS 
+        order. Rows are built one at a time so callers can stream them out.
+        
+        Keyword arguments: 
+        resorts -- list of Resort objects, used for the name and state columns
+        state -- only include resorts in this state (full or short name)
+        conditions -- only include periods with one of these conditions
+        file -- the forecast json file to read
+        """
+        resorts_by_id = {resort.resort_id: resort for resort in resorts}
+        if state:
+            state = state.lower()
+
+        for forecast in self.get_all_forecasts(file):
+            resort = resorts_by_id.get(forecast.resort_id)
+            if resort is None:
+                continue
+            if state and state not in (resort.state.lower(), resort.state_short.lower()):
+                continue
+            for period in forecast.periods:
+                if conditions and period.conditions not in conditions:
+                    continue
+                yield {
+                    'resort_id': resort.resort_id,
+                    'name': resort.name,
+                    'state': resort.state,
+                    'state_short': resort.state_short,
+                    'forecast_date': forecast.forecast_date,
+                    'date': period.period_date,
+                    'min_temp': period.min_temp,
+                    'max_temp': period.max_temp,
+                    'snow_in': period.snow_in,
+                    'weather': period.weather,
+                    'weather_coded': period.weather_coded,
+                    'humidity': period.humidity,
+                    'conditions': period.conditions
+                }
+
+    def diff_forecasts(self, old_forecasts:list, new_forecasts:list) -> list:
+        """Return a list of the periods whose conditions changed between two 
+        lists of Forecast objects
+        
+        Keyword arguments: 
+        old_forecasts -- list of previously saved Forecast objects
+        new_forecasts -- list of freshly loaded Forecast objects
+        """
+        old_conditions = {}
+        for forecast in old_forecasts:
+            for period in forecast.periods:
+                old_conditions[(forecast.resort_id, period.period_date)] = period.conditions
+
+        changes = []
+        for forecast in new_forecasts:
+            for period in forecast.periods:
+                old = old_conditions.get((forecast.resort_id, period.period_date))
+                if old != period.conditions:
+                    changes.append({
+                        'resort_id': forecast.resort_id,
+                        'date': period.period_date,
+                        'old': old,
+                        'new': period.conditions
+                    })
+
+        return changes
+
+
+class ForecastBroadcaster:
     """
-    Class that retreives Forecast data from external API
+    Class that watches the forecast file and pushes condition changes to 
+    every subscriber from a single in-process thread.
+
+    Methods:
+    ________
+    subscribe(start_watcher)
+        returns a queue that receives each published message
+    subscribe_async(loop, start_watcher)
+        returns an asyncio queue that receives each published message
+    unsubscribe(subscriber)
+        stops sending messages to a subscriber queue
+    publish(message)
+        sends a message to every subscriber queue
+    check_for_updates()
+        publishes a diff if the forecast file changed since the last check
+    """
+    POLL_SECONDS = 5
+    MAX_QUEUED_MESSAGES = 10
+    # put on a subscriber queue when it is dropped, so its stream can end 
+    # and the client reconnect instead of waiting forever
+    CLOSED = {'closed': True}
+
+    def __init__(self, file:str=ForecastModel.FORECASTS_FILE):
+        self.file = file
+        # subscriber queue -> function that puts a message on it
+        self.subscribers = {}
+        self.lock = threading.Lock()
+        self.watcher = None
+        self.last_mtime = None
+        self.last_forecasts = []
+
+    def subscribe(self, start_watcher:bool=True) -> queue.Queue:
+        """
+        Return a new subscriber queue, starting the file watcher if needed.
+        
+        Keyword arguments: 
+        start_watcher -- start the file watcher thread if it isn't running
+        """
+        subscriber = queue.Queue()
+        self.add_subscriber(subscriber, subscriber.put_nowait, start_watcher)
+        return subscriber
+
+    def subscribe_async(self, loop:asyncio.AbstractEventLoop, 
+            start_watcher:bool=True) -> asyncio.Queue:
+        """
+        Return a new asyncio subscriber queue. Messages are handed to the 
+        event loop that owns it, so awaiting the queue costs nothing while idle.
+        
+        Keyword arguments: 
+        loop -- the running event loop of the subscriber
+        start_watcher -- start the file watcher thread if it isn't running
+        """
+        subscriber = asyncio.Queue()
+        self.add_subscriber(subscriber, 
+            lambda message: loop.call_soon_threadsafe(subscriber.put_nowait, message), 
+            start_watcher)
+        return subscriber
+
+    def add_subscriber(self, subscriber, put, start_watcher:bool):
+        """
+        Register a subscriber queue and start the file watcher if needed.
+        """
+        with self.lock:
+            self.subscribers[subscriber] = put
+            if start_watcher and self.watcher is None:
+                self.watcher = threading.Thread(target=self.watch, daemon=True)
+                self.watcher.start()
+
+    def unsubscribe(self, subscriber):
+        """
+        Stop sending messages to a subscriber queue.
+        """
+        with self.lock:
+            self.subscribers.pop(subscriber, None)
+
+    def publish(self, message:dict):
+        """Send a message to every subscriber. Subscribers that have fallen 
+        too far behind are sent CLOSED and dropped rather than buffering 
+        without limit.
+        
+        Keyword arguments: 
+        message -- a json-serializable dict
+        """
+        with self.lock:
+            subscribers = list(self.subscribers.items())
+        for subscriber, put in subscribers:
+            try:
+                if subscriber.qsize() >= self.MAX_QUEUED_MESSAGES:
+                    self.unsubscribe(subscriber)
+                    put(self.CLOSED)
+                else:
+                    put(message)
+            except RuntimeError:
+                # the subscriber's event loop has closed
+                self.unsubscribe(subscriber)
+
+    def check_for_updates(self) -> list:
+        """
+        Publish the changed conditions if the forecast file was modified since 
+        the last check and return the list of changes.
+        """
+        try:
+            mtime = os.path.getmtime(self.file)
+        except OSError:
+            return []
+        if mtime == self.last_mtime:
+            return []
+
+        forecast_model = ForecastModel()
+        forecasts = forecast_model.get_all_forecasts(self.file)
+        changes = []
+        # the first read only primes the snapshot, there is nothing to compare
+        if self.last_mtime is not None:
+            changes = forecast_model.diff_forecasts(self.last_forecasts, forecasts)
+        self.last_mtime = mtime
+        self.last_forecasts = forecasts
+
+        if changes:
+            self.publish({'changes': changes})
+        return changes
+
+    def watch(self):
+        """
+        Poll the forecast file for changes for the lifetime of the process.
+        """
+        while True:
+            try:
+                self.check_for_updates()
+            except (OSError, ValueError):
+                pass
+            time.sleep(self.POLL_SECONDS)
+
+
+
+class AerisWeatherAdapter:
+    """
+    Class that requests forecast periods from the AerisWeather API
 
     Methods:
     ________
     fetch_forecast(lat, long)
-        request weather data based on lat/long from external API
-    load_forecasts_from_api(resorts)
-        load weather data for each resort in resorts
+        request weather data based on lat/long from the API
+    fetch_periods(lat, long)
+        request weather data and map it into ForecastPeriod objects
     """
     API_URL = "https://aerisweather1.p.rapidapi.com/forecasts/"
     API_KEY = os.environ.get('API_KEY')
@@ -292,6 +636,10 @@ class ForecastAPILoader:
                 'x-rapidapi-key': API_KEY
                 }
 
+    def __init__(self, api_url:str=API_URL, timeout:float=10):
+        self.api_url = api_url
+        self.timeout = timeout
+
     def fetch_forecast(self, lat, lon) -> dict:
         """
         Requeset weather data from external API based on lat/long and return json text.
@@ -312,50 +660,311 @@ class ForecastAPILoader:
             'periods.weatherPrimaryCoded'
             ]
         
-        request_url = (self.API_URL+lat+','+lon+'?fields='+','.join(response_fields))
-        response = requests.request("GET", request_url, headers=self.API_HEADER)
+        request_url = (self.api_url+lat+','+lon+'?fields='+','.join(response_fields))
+        response = requests.request("GET", request_url, headers=self.API_HEADER, 
+            timeout=self.timeout)
+        response.raise_for_status()
         data = json.loads(response.text)
         return data
+
+    def fetch_periods(self, lat, lon) -> list:
+        """
+        Return a list of ForecastPeriod objects for a lat/long. Raises 
+        ValueError if the API did not return a forecast.
+        
+        Keyword arguments: 
+        lat -- the latitude of the weather forecast coordinates
+        long -- the longitude of the weather forecast coordinates
+        """
+        forecast_data = self.fetch_forecast(lat, lon)
+        response = forecast_data.get('response')
+        if not response:
+            raise ValueError('no forecast in the API response')
+
+        fs = FauxSnow()
+        periods = []
+        for period_data in response[0]['periods']:
+            periods.append(ForecastPeriod(
+                datetime.datetime.strptime(period_data['validTime'], 
+                    '%Y-%m-%dT%H:%M:%S%z').strftime("%a %-d"),
+                period_data['minTempF'],
+                period_data['maxTempF'],
+                period_data['snowIN'],
+                period_data['weatherPrimary'],
+                period_data['weatherPrimaryCoded'],
+                period_data['minHumidity'],
+                fs.calc_conditions(
+                    period_data['weatherPrimaryCoded'],
+                    period_data['snowIN'],
+                    period_data['minTempF'],
+                    period_data['minHumidity'])
+            ))
+        return periods
+
+
+class OpenMeteoAdapter:
+    """
+    Class that requests forecast periods from the Open-Meteo API. Used as a 
+    secondary provider, so its WMO weather codes are mapped onto the 
+    AerisWeather coded weather that calc_conditions expects.
+
+    Methods:
+    ________
+    fetch_forecast(lat, long)
+        request weather data based on lat/long from the API
+    fetch_periods(lat, long)
+        request weather data and map it into ForecastPeriod objects
+    """
+    API_URL = "https://api.open-meteo.com/v1/forecast"
+    # WMO weather code -> (AerisWeather coded weather, description)
+    WEATHER_CODES = {
+        0: ('::CL', 'Sunny'),
+        1: ('::FW', 'Mostly Sunny'),
+        2: ('::SC', 'Partly Cloudy'),
+        3: ('::OV', 'Cloudy'),
+        45: ('::F', 'Fog'),
+        48: ('::ZF', 'Freezing Fog'),
+        51: ('L::L', 'Light Drizzle'),
+        53: ('::L', 'Drizzle'),
+        55: ('H::L', 'Heavy Drizzle'),
+        56: ('L::ZL', 'Light Freezing Drizzle'),
+        57: ('::ZL', 'Freezing Drizzle'),
+        61: ('L::R', 'Light Rain'),
+        63: ('::R', 'Rain'),
+        65: ('H::R', 'Heavy Rain'),
+        66: ('L::ZR', 'Light Freezing Rain'),
+        67: ('::ZR', 'Freezing Rain'),
+        71: ('L::S', 'Light Snow'),
+        73: ('::S', 'Snow'),
+        75: ('H::S', 'Heavy Snow'),
+        77: ('::S', 'Snow Grains'),
+        80: ('L::RW', 'Light Rain Showers'),
+        81: ('::RW', 'Rain Showers'),
+        82: ('H::RW', 'Heavy Rain Showers'),
+        85: ('L::SW', 'Light Snow Showers'),
+        86: ('H::SW', 'Heavy Snow Showers'),
+        95: ('::T', 'Thunderstorms'),
+        96: ('::T', 'Thunderstorms'),
+        99: ('::T', 'Thunderstorms')
+    }
+
+    def __init__(self, api_url:str=API_URL, timeout:float=10):
+        self.api_url = api_url
+        self.timeout = timeout
+
+    def fetch_forecast(self, lat, lon) -> dict:
+        """
+        Request 7 days of daily weather data based on lat/long and return json text.
+        
+        Keyword arguments: 
+        lat -- the latitude of the weather forecast coordinates
+        long -- the longitude of the weather forecast coordinates
+        """
+        params = {
+            'latitude': lat,
+            'longitude': lon,
+            'daily': ','.join([
+                'temperature_2m_max',
+                'temperature_2m_min',
+                'snowfall_sum',
+                'relative_humidity_2m_min',
+                'weather_code'
+                ]),
+            'temperature_unit': 'fahrenheit',
+            'precipitation_unit': 'inch',
+            'timezone': 'auto',
+            'forecast_days': 7
+        }
+        response = requests.request("GET", self.api_url, params=params, 
+            timeout=self.timeout)
+        response.raise_for_status()
+        data = json.loads(response.text)
+        return data
+
+    def fetch_periods(self, lat, lon) -> list:
+        """
+        Return a list of ForecastPeriod objects for a lat/long. Raises 
+        ValueError if the API did not return a forecast.
+        
+        Keyword arguments: 
+        lat -- the latitude of the weather forecast coordinates
+        long -- the longitude of the weather forecast coordinates
+        """
+        daily = self.fetch_forecast(lat, lon).get('daily')
+        if not daily:
+            raise ValueError('no forecast in the API response')
+
+        fs = FauxSnow()
+        periods = []
+        for i, day in enumerate(daily['time']):
+            weather_coded, weather = self.WEATHER_CODES.get(
+                daily['weather_code'][i], ('::OV', 'Cloudy'))
+            min_temp = round(daily['temperature_2m_min'][i])
+            snow_in = round(daily['snowfall_sum'][i], 2)
+            humidity = daily['relative_humidity_2m_min'][i]
+            periods.append(ForecastPeriod(
+                datetime.datetime.strptime(day, '%Y-%m-%d').strftime("%a %-d"),
+                min_temp,
+                round(daily['temperature_2m_max'][i]),
+                snow_in,
+                weather,
+                weather_coded,
+                humidity,
+                fs.calc_conditions(weather_coded, snow_in, min_temp, humidity)
+            ))
+        return periods
+
+
+class ForecastAPILoader:
+    """
+    Class that retreives Forecast data from external APIs. When the primary 
+    provider is slower than a percentile of its recent response times, a 
+    hedge request is sent to the secondary provider (or the primary again) 
+    and whichever answers first wins.
+
+    Methods:
+    ________
+    hedge_delay()
+        returns how long to wait for the primary provider before hedging
+    fetch_periods(lat, long)
+        request ForecastPeriods for a lat/long with hedging and failover
+    load_forecasts_from_api(resorts, last_forecasts)
+        load weather data for each resort in resorts
+    """
+    HEDGE_PERCENTILE = 95
+    DEFAULT_HEDGE_SECONDS = 2.0
+    MIN_LATENCY_SAMPLES = 5
+    MAX_LATENCY_SAMPLES = 100
+    # recent primary provider response times, shared by every loader in the 
+    # process so each refresh doesn't start over on DEFAULT_HEDGE_SECONDS
+    latencies = []
+    latencies_lock = threading.Lock()
+
+    def __init__(self, providers:list=None, hedge_percentile:float=None):
+        if providers is None:
+            providers = [AerisWeatherAdapter(), OpenMeteoAdapter()]
+        self.providers = providers
+        if hedge_percentile is None:
+            hedge_percentile = os.environ.get('HEDGE_PERCENTILE', self.HEDGE_PERCENTILE)
+        self.hedge_percentile = self.parse_percentile(hedge_percentile)
+
+    def parse_percentile(self, value) -> float:
+        """Return value as a percentile, or HEDGE_PERCENTILE if it isn't a 
+        number from 0 to 100.
+        
+        Keyword arguments: 
+        value -- the percentile, e.g. 95 or "95"
+        """
+        try:
+            percentile = float(value)
+        except (TypeError, ValueError):
+            return self.HEDGE_PERCENTILE
+        if not 0 <= percentile <= 100:
+            return self.HEDGE_PERCENTILE
+        return percentile
+
+    def hedge_delay(self) -> float:
+        """
+        Return the hedge_percentile of recent primary provider response 
+        times, or DEFAULT_HEDGE_SECONDS until there are enough samples.
+        """
+        if len(self.latencies) < self.MIN_LATENCY_SAMPLES:
+            return self.DEFAULT_HEDGE_SECONDS
+        return float(numpy.percentile(self.latencies, self.hedge_percentile))
+
+    def timed_fetch(self, provider, lat, lon) -> list:
+        """
+        Fetch periods from a provider, recording the latency of the primary.
+        """
+        start = time.perf_counter()
+        periods = provider.fetch_periods(lat, lon)
+        if provider is self.providers[0]:
+            with self.latencies_lock:
+                self.latencies.append(time.perf_counter() - start)
+                del self.latencies[:-self.MAX_LATENCY_SAMPLES]
+        return periods
+
+    def start_fetch(self, provider, lat, lon, results:queue.Queue):
+        """Fetch periods from a provider on a daemon thread and put 
+        (succeeded, periods or exception) on results. A request that loses 
+        the race is abandoned, and a daemon thread doesn't keep the process 
+        alive waiting for it.
+        
+        Keyword arguments: 
+        provider -- the adapter to fetch from
+        lat -- the latitude of the weather forecast coordinates
+        long -- the longitude of the weather forecast coordinates
+        results -- queue the outcome is put on
+        """
+        def fetch():
+            try:
+                results.put((True, self.timed_fetch(provider, lat, lon)))
+            except Exception as error:
+                results.put((False, error))
+        threading.Thread(target=fetch, daemon=True).start()
+
+    def fetch_periods(self, lat, lon) -> list:
+        """Return ForecastPeriods for a lat/long from whichever request 
+        succeeds first, or None if every request failed.
+        
+        Keyword arguments: 
+        lat -- the latitude of the weather forecast coordinates
+        long -- the longitude of the weather forecast coordinates
+        """
+        primary = self.providers[0]
+        secondary = self.providers[1] if len(self.providers) > 1 else primary
+
+        results = queue.Queue()
+        self.start_fetch(primary, lat, lon, results)
+        in_flight = 1
+        hedged = False
+        while in_flight:
+            try:
+                succeeded, periods = results.get(timeout=None if hedged else self.hedge_delay())
+                in_flight -= 1
+                if succeeded:
+                    return periods
+            except queue.Empty:
+                pass
+            # the primary is slow or failed, so send the hedge request now
+            if not hedged:
+                self.start_fetch(secondary, lat, lon, results)
+                in_flight += 1
+                hedged = True
+        return None
     
-    def load_forecasts_from_api(self, resorts) -> list:
-        """updates the Foreecast object for each resort
+    def load_forecasts_from_api(self, resorts, last_forecasts:list=None) -> list:
+        """updates the Foreecast object for each resort. Resorts that 
+        could not be updated keep their last good forecast.
         
         Keyword arguments: 
         resorts -- a list of resort dict objects
+        last_forecasts -- list of the previously saved Forecast objects
         """
+        last_by_id = {}
+        for forecast in last_forecasts or []:
+            last_by_id[forecast.resort_id] = forecast
 
         forecasts = []
-        fs = FauxSnow()
+        updated = 0
         for resort in resorts:
-            forecast_data = self.fetch_forecast(resort.lat, resort.long)
-            response = forecast_data.get('response')
+            periods = self.fetch_periods(resort.lat, resort.long)
             
-            # if the api call doesn't return a response value, 
-            # exit the function and return None
-            if response:
+            if periods:
                 forecast = Forecast(
                     resort.resort_id,
                     datetime.datetime.now().strftime("%d/%m/%Y %I:%M %p")
                 )
-
-                for period_data in forecast_data['response'][0]['periods']:
-                    forecast_period = ForecastPeriod(
-                        datetime.datetime.strptime(period_data['validTime'], 
-                            '%Y-%m-%dT%H:%M:%S%z').strftime("%a %-d"),
-                        period_data['minTempF'],
-                        period_data['maxTempF'],
-                        period_data['snowIN'],
-                        period_data['weatherPrimary'],
-                        period_data['weatherPrimaryCoded'],
-                        period_data['minHumidity'],
-                        fs.calc_conditions(
-                            period_data['weatherPrimaryCoded'],
-                            period_data['snowIN'],
-                            period_data['minTempF'],
-                            period_data['minHumidity'])
-                    )
-                    forecast.periods.append(forecast_period)
+                forecast.periods.extend(periods)
                 forecasts.append(forecast)
+                updated += 1
+            elif resort.resort_id in last_by_id:
+                forecasts.append(last_by_id[resort.resort_id])
+
+        # if no resort could be updated, return an empty list so callers
+        # report the failure instead of re-saving the old data
+        if not updated:
+            return []
         return forecasts
 
 
@@ -372,11 +981,17 @@ class FauxSnow:
         converts from Celcius to Fahrenheit
     calc_wet_bulb()
         calculates the wet bulb temp based on temp and relative humidity
+    calc_wet_bulb_margin()
+        calculates how far the wet bulb temp is below the snow making threshold
+    calc_snowmaking_hours()
+        estimates the hours in a period that are cold enough for snow making
     conditions_are_good()
         determines if conditions are good for snow making
     calc_coditions()
         calculates whether the conditions are good for faux-snow or real snow or no snow
     """
+    SNOWMAKING_WET_BULB = 20
+
     def calc_celcius(self, Tf) -> int:
         """Return a temperature converted from Fahrenheit to Celcius
         
@@ -393,22 +1008,56 @@ class FauxSnow:
         """
         return round((Tc * (9/5)) + 32)
 
-    # Function immplemented but not in use. 
-    # Easier to just test the boundaries of the temp/rel. humidity matrix.
+    # Not used for the conditions, it's easier to just test the boundaries 
+    # of the temp/rel. humidity matrix. Used to rank resorts by margin.
     def calc_wet_bulb(self, T, rh) -> float:
         """Return a wet-bulb temperature based on Temperature and Relative Humidity
         
         Keyword arguments:
-        T -- the temperature in Celcius
-        rh -- the relative humidity
+        T -- the temperature in Fahrenheit
+        rh -- the relative humidity (%)
         """
         T = self.calc_celcius(T)   
-        rh /= 100             
         Tw = (T * numpy.arctan([0.151977 * (rh + 8.313659)**(1/2)])[0] + 
             numpy.arctan([T + rh])[0] - 
             numpy.arctan([rh - 1.676331])[0] + 0.00391838 *(rh)**(3/2) * 
             numpy.arctan([0.023101 * rh])[0] - 4.686035)
         return self.calc_fahrenheit(Tw) 
+
+    def calc_wet_bulb_margin(self, min_temp, humidity) -> int:
+        """Return how many degrees the coldest wet-bulb temperature of the 
+        period is below the snow making threshold (negative if above)
+        
+        Keyword arguments:
+        min_temp -- the lowest temperature in the period (F)
+        humidity -- the relative humidity in the period
+        """
+        return self.SNOWMAKING_WET_BULB - self.calc_wet_bulb(min_temp, humidity)
+
+    def calc_snowmaking_hours(self, min_temp, max_temp, humidity) -> float:
+        """Return an estimate of the hours in the period that the wet-bulb 
+        temperature is at or below the snow making threshold, assuming the 
+        temperature follows a sine curve between min_temp and max_temp
+        
+        Keyword arguments:
+        min_temp -- the lowest temperature in the period (F)
+        max_temp -- the highest temperature in the period (F)
+        humidity -- the relative humidity in the period
+        """
+        if self.calc_wet_bulb(min_temp, humidity) > self.SNOWMAKING_WET_BULB:
+            return 0.0
+        if self.calc_wet_bulb(max_temp, humidity) <= self.SNOWMAKING_WET_BULB:
+            return 24.0
+
+        # the warmest temperature that still makes snow
+        threshold = min_temp
+        while self.calc_wet_bulb(threshold + 1, humidity) <= self.SNOWMAKING_WET_BULB:
+            threshold += 1
+
+        mid = (max_temp + min_temp) / 2
+        amplitude = (max_temp - min_temp) / 2
+        fraction = numpy.arccos((mid - threshold) / amplitude) / numpy.pi
+        return round(24 * float(fraction), 1)
     
     def conditions_are_good(self, min_temp, humidity) -> bool:
         """Return whether or not the temperature and relative humidity are 
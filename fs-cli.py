@@ -2,7 +2,10 @@ from fauxsnow import ResortModel, ForecastModel, ForecastAPILoader
 from rich import print
 from rich.console import Console
 from rich.table import Table
-import argparse
+import argparse, csv, itertools, json, os, sys
+
+EXPORT_CHUNK_ROWS = 1000
+STATIC_SITE_DIR = 'build'
 
 def refresh():
     """get the weather forecast from the weather API for each 
@@ -13,7 +16,7 @@ def refresh():
     fm = ForecastModel()
     resorts = rm.get_all_resorts(False)
     fAPI = ForecastAPILoader()
-    forecasts = fAPI.load_forecasts_from_api(resorts)
+    forecasts = fAPI.load_forecasts_from_api(resorts, fm.get_all_forecasts())
 
     # if the api call returns None, fail gracefully.
     if forecasts:
@@ -163,6 +166,207 @@ def detail(resort_id):
     except StopIteration:
         print('invalid id')        
 
+def day_ranking(day):
+    """print every resort ranked for one forecast day
+
+    Keyword arguments: 
+    day -- a day from the saved rankings
+    """
+    day_table = Table(title="Rankings for " + day['date'])
+    day_table.add_column("#", 
+        justify="right", 
+        style="cyan", 
+        no_wrap=True, 
+        min_width=2)
+
+    for column in ["Resort", "Conditions", "Wet-bulb Margin (F)", "Snowmaking Hours"]:
+        day_table.add_column(column, 
+            justify="left", 
+            style="cyan", 
+            no_wrap=True)
+
+    for rank, resort in enumerate(day['resorts'], 1):
+        day_table.add_row(str(rank), 
+            "(" + resort['state_short'] + ") " + resort['name'], 
+            resort['conditions'], 
+            str(resort['wet_bulb_margin']), 
+            str(resort['snowmaking_hours']))
+
+    console = Console()
+    console.print(day_table)
+
+def rankings(day=None):
+    """read the rankings saved with the last refresh and print the 
+        best bets, faux streaks and state summaries to the screen, 
+        or every resort ranked for one day
+
+    Keyword arguments: 
+    day -- the forecast day to rank resorts for, e.g. "Sat 8"
+    """
+    fm = ForecastModel()
+    ranked = fm.get_rankings()
+
+    if day:
+        match = next((d for d in ranked['days'] if d['date'].lower() == day.lower()), None)
+        if match is None:
+            print('no rankings for ' + day + ', choose one of: ' 
+                + ', '.join(d['date'] for d in ranked['days']), file=sys.stderr)
+            sys.exit(1)
+        day_ranking(match)
+        return
+
+    bets_table = Table(title="Best Bets")
+    for column in ["Day", "Resort", "Conditions", "Wet-bulb Margin (F)", "Snowmaking Hours"]:
+        bets_table.add_column(column, 
+            justify="left", 
+            style="cyan", 
+            no_wrap=True)
+
+    for bet in ranked['best_bets']:
+        resort = bet['resort']
+        if resort:
+            bets_table.add_row(bet['date'], 
+                "(" + resort['state_short'] + ") " + resort['name'], 
+                resort['conditions'], 
+                str(resort['wet_bulb_margin']), 
+                str(resort['snowmaking_hours']))
+        else:
+            bets_table.add_row(bet['date'], "-", "", "", "")
+
+    streaks_table = Table(title="Faux Streaks")
+    for column in ["Resort", "From", "To", "Days"]:
+        streaks_table.add_column(column, 
+            justify="left", 
+            style="cyan", 
+            no_wrap=True)
+
+    for streak in ranked['streaks']:
+        streaks_table.add_row("(" + streak['state_short'] + ") " + streak['name'], 
+            streak['start'], 
+            streak['end'], 
+            str(streak['days']))
+
+    states_table = Table(title="By State")
+    for column in ["State", "Resorts", "Faux Days", "Snow Days", "Best Resort"]:
+        states_table.add_column(column, 
+            justify="left", 
+            style="cyan", 
+            no_wrap=True)
+
+    for state in ranked['states']:
+        states_table.add_row(state['state'], 
+            str(state['resorts']), 
+            str(state['faux_days']), 
+            str(state['snow_days']), 
+            state['best_resort_name'] or "")
+
+    console = Console()
+    console.print(bets_table)
+    console.print(streaks_table)
+    console.print(states_table)
+    print('Add --day DAY (e.g. --day "Sat 8") to rank every resort for one day')
+
+def chunked(rows, size):
+    """yield lists of at most size rows from an iterator of rows
+
+    Keyword arguments: 
+    rows -- an iterator of rows
+    size -- the max number of rows per chunk
+    """
+    rows = iter(rows)
+    chunk = list(itertools.islice(rows, size))
+    while chunk:
+        yield chunk
+        chunk = list(itertools.islice(rows, size))
+
+def export(export_format, output=None, state=None, conditions=None):
+    """stream every resort/forecast period row to stdout or a file 
+        as csv, ndjson or parquet, one chunk at a time
+
+    Keyword arguments: 
+    export_format -- csv, ndjson or parquet
+    output -- the file to write to, stdout if None
+    state -- only export resorts in this state
+    conditions -- only export periods with one of these conditions
+    """
+    try:
+        write_export(export_format, output, state, conditions)
+    except BrokenPipeError:
+        # the reader (e.g. head) stopped early. Point stdout at devnull so 
+        # the final flush at exit doesn't raise again, then exit quietly.
+        devnull = os.open(os.devnull, os.O_WRONLY)
+        os.dup2(devnull, sys.stdout.fileno())
+        sys.exit(1)
+
+def write_export(export_format, output, state, conditions):
+    """write the export rows, see export()
+
+    """
+    rm = ResortModel()
+    fm = ForecastModel()
+    resorts = rm.get_all_resorts(False)
+    rows = fm.iter_forecast_rows(resorts, state, conditions)
+
+    if export_format == 'parquet':
+        try:
+            import pyarrow, pyarrow.parquet
+        except ImportError:
+            print('parquet export requires the pyarrow module', file=sys.stderr)
+            sys.exit(1)
+        schema = pyarrow.schema([
+            ('resort_id', pyarrow.string()),
+            ('name', pyarrow.string()),
+            ('state', pyarrow.string()),
+            ('state_short', pyarrow.string()),
+            ('forecast_date', pyarrow.string()),
+            ('date', pyarrow.string()),
+            ('min_temp', pyarrow.int64()),
+            ('max_temp', pyarrow.int64()),
+            ('snow_in', pyarrow.float64()),
+            ('weather', pyarrow.string()),
+            ('weather_coded', pyarrow.string()),
+            ('humidity', pyarrow.int64()),
+            ('conditions', pyarrow.string())
+        ])
+        # each chunk becomes its own row group, so memory use is bounded 
+        # by the chunk size rather than the size of the export
+        with pyarrow.parquet.ParquetWriter(output or sys.stdout.buffer, schema) as writer:
+            for chunk in chunked(rows, EXPORT_CHUNK_ROWS):
+                writer.write_table(pyarrow.Table.from_pylist(chunk, schema=schema))
+        return
+
+    outfile = open(output, 'w', newline='') if output else sys.stdout
+    try:
+        if export_format == 'csv':
+            writer = csv.DictWriter(outfile, fieldnames=ForecastModel.EXPORT_FIELDS)
+            writer.writeheader()
+            for chunk in chunked(rows, EXPORT_CHUNK_ROWS):
+                writer.writerows(chunk)
+        else:
+            for chunk in chunked(rows, EXPORT_CHUNK_ROWS):
+                outfile.write(''.join(json.dumps(row) + '\n' for row in chunk))
+    finally:
+        if output:
+            outfile.close()
+
+def static_site(output_dir=None):
+    """render every page of the web app into a directory that can be 
+        served by a static file server
+
+    Keyword arguments: 
+    output_dir -- the directory to write the site to
+    """
+    # loads flask and the web app, so only import it for this command
+    from static_site import build_static
+
+    output_dir = output_dir or STATIC_SITE_DIR
+    try:
+        rebuilt = build_static(output_dir)
+    except RuntimeError as error:
+        print(str(error), file=sys.stderr)
+        sys.exit(1)
+    print('Rebuilt ' + str(len(rebuilt)) + ' pages in ' + output_dir)
+
 # controller function for the command line interface
 def main():
     parser = argparse.ArgumentParser(description='Faux Snow Forecast app')
@@ -178,6 +382,35 @@ def main():
         action = 'store_true', 
         help='Display the resort details')
 
+    parser.add_argument('--rankings',  
+        action = 'store_true', 
+        help='Display the best bets, faux streaks and state summaries')
+
+    parser.add_argument('--day',  
+        type=str, 
+        help='With --rankings, rank every resort for this forecast day, e.g. "Sat 8"')
+
+    parser.add_argument('--export',  
+        choices = ['csv', 'ndjson', 'parquet'], 
+        help='Export every resort forecast period in the given format')
+
+    parser.add_argument('--build-static',  
+        action = 'store_true', 
+        help='Render the web app into a static site (after refreshing, if used with --refresh)')
+
+    parser.add_argument('--output',  
+        type=str, 
+        help='File to write the export to (defaults to stdout), or directory for the static site (defaults to build)')
+
+    parser.add_argument('--state',  
+        type=str, 
+        help='Only export resorts in this state, e.g. WV or "West Virginia"')
+
+    parser.add_argument('--conditions',  
+        nargs = '+', 
+        choices = ['Faux', 'Snow'], 
+        help='Only export forecast periods with these conditions')
+
     parser.add_argument('id', 
         type=str, 
         nargs = '?', 
@@ -187,12 +420,21 @@ def main():
 
     if args.refresh:
         refresh()
+        if args.build_static:
+            static_site(args.output)
     elif args.forecast:
         forecast()
     elif args.detail:
         detail(args.id)
+    elif args.rankings:
+        rankings(args.day)
+    elif args.export:
+        export(args.export, args.output, args.state, args.conditions)
+    elif args.build_static:
+        static_site(args.output)
     else:
         parser.format_usage()
 
 
-main()
+if __name__ == '__main__':
+    main()
@@ -1,2 +1,9 @@
-bind = "0.0.0.0:8080"
-workers = 2
\ No newline at end of file
+import os
+
+bind = os.environ.get("BIND", "0.0.0.0:8080")
+workers = int(os.environ.get("WEB_CONCURRENCY", 2))
+# /events holds a connection open per client, so use a cooperative worker 
+# where an idle stream costs a greenlet instead of a whole worker.
+# Serve the async app with WORKER_CLASS=uvicorn.workers.UvicornWorker and asgi:app
+worker_class = os.environ.get("WORKER_CLASS", "gevent")
+worker_connections = int(os.environ.get("WORKER_CONNECTIONS", 1000))
@@ -0,0 +1,101 @@
+from concurrent.futures import ThreadPoolExecutor
+from rich.console import Console
+from rich.table import Table
+import argparse, requests, threading, time, numpy
+
+DEFAULT_PATHS = ['/', '/detail/snowshoe', '/about']
+
+def run_path(base_url, path, num_requests, concurrency) -> dict:
+    """send num_requests GET requests to one path and return the
+        throughput and latency stats
+
+    Keyword arguments:
+    base_url -- the server to test, e.g. http://localhost:8080
+    path -- the path to request
+    num_requests -- the total number of requests to send
+    concurrency -- the number of requests in flight at once
+    """
+    local = threading.local()
+
+    def timed_get(_):
+        # one keep-alive session per client thread
+        if not hasattr(local, 'session'):
+            local.session = requests.Session()
+        start = time.perf_counter()
+        try:
+            ok = local.session.get(base_url + path, timeout=30).status_code == 200
+        except requests.RequestException:
+            ok = False
+        return time.perf_counter() - start, ok
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        results = list(executor.map(timed_get, range(num_requests)))
+    elapsed = time.perf_counter() - start
+
+    # failed requests are often fast connection errors, so leave them out 
+    # of the latency stats rather than let them flatter the percentiles
+    latencies = numpy.array([latency for latency, ok in results if ok]) * 1000
+    successes = len(latencies)
+    if not successes:
+        latencies = numpy.array([numpy.nan])
+    return {
+        # a server that fails fast must not look faster than one that works
+        'rps': successes / elapsed,
+        'p50': numpy.percentile(latencies, 50),
+        'p95': numpy.percentile(latencies, 95),
+        'p99': numpy.percentile(latencies, 99),
+        'max': latencies.max(),
+        'errors': sum(1 for latency, ok in results if not ok)
+    }
+
+# controller function for the load test harness
+def main():
+    parser = argparse.ArgumentParser(description='Faux Snow web app load test')
+    parser.add_argument('--url',
+        action = 'append',
+        help='NAME=BASE_URL of a server to test, e.g. sync=http://localhost:8080 (repeatable)')
+
+    parser.add_argument('--requests',
+        type=int,
+        default=500,
+        help='Number of requests per path')
+
+    parser.add_argument('--concurrency',
+        type=int,
+        default=20,
+        help='Number of concurrent clients')
+
+    parser.add_argument('--path',
+        action = 'append',
+        help='Path to request (repeatable, defaults to /, /detail/snowshoe and /about)')
+
+    args = parser.parse_args()
+    targets = args.url or ['sync=http://localhost:8080']
+    paths = args.path or DEFAULT_PATHS
+
+    table = Table(title="Load Test (%d requests, %d concurrent)" % (args.requests, args.concurrency))
+    for column in ["Server", "Path", "OK Req/s", "p50 (ms)", "p95 (ms)", "p99 (ms)", "Max (ms)", "Errors"]:
+        table.add_column(column,
+            justify="left" if column in ["Server", "Path"] else "right",
+            style="cyan",
+            no_wrap=True)
+
+    for target in targets:
+        name, _, base_url = target.rpartition('=')
+        for path in paths:
+            stats = run_path(base_url.rstrip('/'), path, args.requests, args.concurrency)
+            table.add_row(name or base_url,
+                path,
+                "%.1f" % stats['rps'],
+                "%.1f" % stats['p50'],
+                "%.1f" % stats['p95'],
+                "%.1f" % stats['p99'],
+                "%.1f" % stats['max'],
+                str(stats['errors']))
+
+    console = Console()
+    console.print(table)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,137 @@
+from app import app
+from fauxsnow import ResortModel, ForecastModel
+from concurrent.futures import ProcessPoolExecutor
+import dataclasses, gzip, hashlib, json, os, shutil
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# renders the web app into a directory of static files, see fs-cli.py --build-static
+
+# pages that depend on every resort, rebuilt whenever any forecast changes
+STATIC_SITE_PAGES = ['/', '/about', '/rankings']
+STATIC_SITE_MANIFEST = '.build-manifest.json'
+
+def static_page_file(url_path):
+    """return the file a page is written to, relative to the output 
+        directory, so a static file server can map the url to it
+
+    Keyword arguments: 
+    url_path -- the url path of the page, e.g. /detail/snowshoe
+    """
+    if url_path == '/404':
+        return '404.html'
+    return os.path.join(url_path.strip('/'), 'index.html')
+
+def write_static_file(path, data):
+    """write a file atomically so the server never sees half a page
+
+    Keyword arguments: 
+    path -- the file to write
+    data -- the bytes to write
+    """
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as outfile:
+        outfile.write(data)
+    os.replace(tmp_path, path)
+
+def build_static_page(url_path, output_dir):
+    """render one page with the app and write it, plus gzip and brotli 
+        variants, to the output directory
+
+    Keyword arguments: 
+    url_path -- the url path of the page, e.g. /detail/snowshoe
+    output_dir -- the directory the site is written to
+    """
+    response = app.test_client().get(url_path)
+    expected_status = 404 if url_path == '/404' else 200
+    if response.status_code != expected_status:
+        raise RuntimeError('could not render ' + url_path + ': ' + response.status)
+    html = response.data
+    path = os.path.join(output_dir, static_page_file(url_path))
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    write_static_file(path, html)
+    write_static_file(path + '.gz', gzip.compress(html, 9, mtime=0))
+    if brotli:
+        write_static_file(path + '.br', brotli.compress(html))
+    return url_path
+
+def remove_static_page(url_path, output_dir):
+    """delete a page and its compressed variants, along with its folder 
+        if that is left empty
+
+    Keyword arguments: 
+    url_path -- the url path of the page, e.g. /detail/snowshoe
+    output_dir -- the directory the site is written to
+    """
+    path = os.path.join(output_dir, static_page_file(url_path))
+    for variant in [path, path + '.gz', path + '.br']:
+        if os.path.exists(variant):
+            os.remove(variant)
+    folder = os.path.dirname(path)
+    if folder != output_dir and os.path.isdir(folder) and not os.listdir(folder):
+        os.rmdir(folder)
+
+def static_page_hashes():
+    """return a hash of the data each page is rendered from, keyed by 
+        url path
+
+    """
+    templates = hashlib.sha256()
+    template_dir = os.path.join(app.root_path, app.template_folder)
+    for name in sorted(os.listdir(template_dir)):
+        with open(os.path.join(template_dir, name), 'rb') as template:
+            templates.update(name.encode() + template.read())
+
+    def page_hash(data):
+        page = templates.copy()
+        page.update(json.dumps(data, sort_keys=True, default=str).encode())
+        return page.hexdigest()
+
+    rm = ResortModel()
+    fm = ForecastModel()
+    resorts = [dataclasses.asdict(resort) for resort in rm.get_all_resorts()]
+    hashes = {'/404': page_hash(None)}
+    for url_path in STATIC_SITE_PAGES:
+        hashes[url_path] = page_hash([resorts, fm.get_rankings()])
+    for resort in resorts:
+        hashes['/detail/' + resort['resort_id']] = page_hash(resort)
+    return hashes
+
+def build_static(output_dir, workers=None) -> list:
+    """render every page of the site into output_dir, skipping pages whose 
+        data has not changed since the last build, and return the url 
+        paths that were rebuilt
+
+    Keyword arguments: 
+    output_dir -- the directory the site is written to
+    workers -- the number of processes to render with, defaults to the cpu count
+    """
+    manifest_path = os.path.join(output_dir, STATIC_SITE_MANIFEST)
+    try:
+        with open(manifest_path) as manifest_file:
+            manifest = json.load(manifest_file)
+    except (FileNotFoundError, ValueError):
+        manifest = {}
+
+    hashes = static_page_hashes()
+    changed = [url_path for url_path, page_hash in hashes.items()
+        if manifest.get(url_path) != page_hash 
+        or not os.path.exists(os.path.join(output_dir, static_page_file(url_path)))]
+
+    os.makedirs(output_dir, exist_ok=True)
+    shutil.copytree(app.static_folder, os.path.join(output_dir, 'static'), dirs_exist_ok=True)
+    if changed:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            list(executor.map(build_static_page, changed, [output_dir] * len(changed)))
+
+    # pages of resorts that are no longer in the list
+    for url_path in manifest:
+        if url_path not in hashes:
+            remove_static_page(url_path, output_dir)
+
+    with open(manifest_path, 'w') as manifest_file:
+        json.dump(hashes, manifest_file, indent=4)
+    return changed
@@ -0,0 +1,27 @@
+import unittest, asyncio
+import app, asgi
+from fauxsnow import ForecastModel
+
+
+class TestApps(unittest.TestCase):
+
+    PATHS = ['/', '/about', '/rankings', '/detail/snowshoe', '/detail/nope']
+
+    def test_sync_and_async_apps_match(self):
+        client = app.app.test_client()
+        sync_codes = [client.get(path).status_code for path in self.PATHS]
+
+        async def get_codes():
+            client = asgi.app.test_client()
+            return [(await client.get(path)).status_code for path in self.PATHS]
+
+        async_codes = asyncio.run(get_codes())
+        self.assertEqual(sync_codes, [200, 200, 200, 200, 404])
+        self.assertEqual(async_codes, sync_codes)
+
+    def test_rankings_page_shows_every_day(self):
+        html = app.app.test_client().get('/rankings').get_data(as_text=True)
+        for day in ForecastModel().get_rankings()['days']:
+            self.assertIn('>' + day['date'] + '</h5>', html)
+            for resort in day['resorts']:
+                self.assertIn(resort['name'], html)
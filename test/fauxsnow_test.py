@@ -1,5 +1,47 @@
-import unittest
-from fauxsnow import Resort, ResortModel, Forecast, ForecastPeriod, ForecastModel, ForecastAPILoader, FauxSnow
+import unittest, tempfile, shutil, os, json, threading, time, asyncio, subprocess, sys
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from fauxsnow import Resort, ResortModel, Forecast, ForecastPeriod, ForecastModel, ForecastAPILoader, ForecastBroadcaster, AerisWeatherAdapter, FauxSnow
+
+
+class StubForecastServer:
+    """
+    AerisWeather-shaped stub API that answers after an injected delay.
+    """
+    def __init__(self, weather, delay=0, status=200, fail_on=None):
+        stub = self
+        self.weather = weather
+        self.delay = delay
+        self.status = status
+        self.fail_on = fail_on
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                time.sleep(stub.delay)
+                body = json.dumps({'response': [{'periods': [{
+                    'validTime': '2022-03-07T07:00:00-05:00',
+                    'minTempF': 18,
+                    'maxTempF': 30,
+                    'snowIN': 0,
+                    'minHumidity': 60,
+                    'weatherPrimary': stub.weather,
+                    'weatherPrimaryCoded': '::CL'
+                }]}]}).encode()
+                failed = stub.fail_on and stub.fail_on in self.path
+                self.send_response(500 if failed else stub.status)
+                self.send_header('Content-Type', 'application/json')
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.url = 'http://127.0.0.1:%d/' % self.server.server_address[1]
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
 
 class TestFS(unittest.TestCase):
 
@@ -54,6 +96,20 @@ class TestFS(unittest.TestCase):
         self.assertEquals(fs.calc_fahrenheit(0), 32)
         self.assertEquals(fs.calc_fahrenheit(-7), 19)
 
+    def test_calc_wet_bulb(self):
+        fs = FauxSnow()
+        self.assertAlmostEqual(fs.calc_wet_bulb(20,100), 20, delta=1)
+        self.assertAlmostEqual(fs.calc_wet_bulb(30,100), 30, delta=1)
+        self.assertLess(fs.calc_wet_bulb(30,20), fs.calc_wet_bulb(30,80))
+
+    def test_calc_snowmaking_hours(self):
+        fs = FauxSnow()
+        self.assertEqual(fs.calc_snowmaking_hours(10,18,90), 24)
+        self.assertEqual(fs.calc_snowmaking_hours(35,43,50), 0)
+        hours = fs.calc_snowmaking_hours(13,26,73)
+        self.assertGreater(hours, 0)
+        self.assertLess(hours, 24)
+
     def test_is_good_conditions(self):
         fs = FauxSnow()
         self.assertTrue(fs.conditions_are_good(18,5))
@@ -64,3 +120,205 @@ class TestFS(unittest.TestCase):
         self.assertEqual(fs.calc_conditions("::S",0.2,32,80),"")
         self.assertEqual(fs.calc_conditions("::S",0.2,28,10),"Faux")
         self.assertEqual(fs.calc_conditions("::S",3.2,32,80),"Snow")
+
+    def test_iter_forecast_rows(self):
+        resorts = ResortModel().get_all_resorts(False, self.TEST_SKI_RESORTS_FILE)
+        model = ForecastModel()
+        rows = list(model.iter_forecast_rows(resorts, file=self.TEST_FORECASTS_FILE))
+        self.assertEqual(len(rows), 17 * 7)
+        self.assertEqual(list(rows[0].keys()), ForecastModel.EXPORT_FIELDS)
+
+        rows = list(model.iter_forecast_rows(resorts, 'wv', ['Faux'], self.TEST_FORECASTS_FILE))
+        self.assertGreater(len(rows), 0)
+        for row in rows:
+            self.assertEqual(row['state_short'], 'WV')
+            self.assertEqual(row['conditions'], 'Faux')
+
+    def test_diff_forecasts(self):
+        model = ForecastModel()
+        old = model.get_all_forecasts(self.TEST_FORECASTS_FILE)
+        new = model.get_all_forecasts(self.TEST_FORECASTS_FILE)
+        self.assertEqual(model.diff_forecasts(old, new), [])
+        new[0].periods[1].conditions = 'Snow'
+        changes = model.diff_forecasts(old, new)
+        self.assertEqual(len(changes), 1)
+        self.assertEqual(changes[0]['resort_id'], new[0].resort_id)
+        self.assertEqual(changes[0]['date'], new[0].periods[1].period_date)
+        self.assertEqual(changes[0]['new'], 'Snow')
+
+    def test_broadcaster_publishes_changes(self):
+        tmp_dir = tempfile.mkdtemp()
+        try:
+            file = os.path.join(tmp_dir, 'forecasts.json')
+            shutil.copy(self.TEST_FORECASTS_FILE, file)
+            broadcaster = ForecastBroadcaster(file)
+            subscriber = broadcaster.subscribe(start_watcher=False)
+            broadcaster.check_for_updates()
+
+            with open(file) as f:
+                data = json.load(f)
+            data[0]['periods'][0]['conditions'] = 'Snow'
+            with open(file, 'w') as f:
+                json.dump(data, f)
+            os.utime(file, (0, 0))
+
+            broadcaster.check_for_updates()
+            message = subscriber.get(timeout=1)
+            self.assertEqual(message['changes'][0]['resort_id'], data[0]['resort_id'])
+            self.assertEqual(message['changes'][0]['new'], 'Snow')
+            broadcaster.unsubscribe(subscriber)
+            self.assertEqual(len(broadcaster.subscribers), 0)
+        finally:
+            shutil.rmtree(tmp_dir)
+
+    def test_broadcaster_closes_slow_subscribers(self):
+        broadcaster = ForecastBroadcaster()
+        slow = broadcaster.subscribe(start_watcher=False)
+        for i in range(broadcaster.MAX_QUEUED_MESSAGES + 2):
+            broadcaster.publish({'changes': [i]})
+        self.assertIsNone(broadcaster.watcher)
+        self.assertNotIn(slow, broadcaster.subscribers)
+
+        messages = [slow.get_nowait() for i in range(slow.qsize())]
+        self.assertEqual(len(messages), broadcaster.MAX_QUEUED_MESSAGES + 1)
+        self.assertIs(messages[-1], broadcaster.CLOSED)
+
+    def test_broadcaster_async_subscriber(self):
+        broadcaster = ForecastBroadcaster()
+
+        async def receive():
+            subscriber = broadcaster.subscribe_async(asyncio.get_running_loop(), start_watcher=False)
+            threading.Thread(target=broadcaster.publish, args=({'changes': [1]},)).start()
+            return await asyncio.wait_for(subscriber.get(), 1)
+
+        self.assertEqual(asyncio.run(receive()), {'changes': [1]})
+
+    def test_hedged_request_beats_slow_primary(self):
+        slow = StubForecastServer('slow', delay=1)
+        fast = StubForecastServer('fast')
+        try:
+            loader = ForecastAPILoader([AerisWeatherAdapter(slow.url), AerisWeatherAdapter(fast.url)])
+            loader.latencies = []
+            loader.DEFAULT_HEDGE_SECONDS = 0.05
+            start = time.perf_counter()
+            periods = loader.fetch_periods('38.4', '-79.9')
+            self.assertLess(time.perf_counter() - start, 0.5)
+            self.assertEqual(periods[0].weather, 'fast')
+            self.assertEqual(periods[0].conditions, 'Faux')
+        finally:
+            slow.close()
+            fast.close()
+
+    def test_abandoned_request_does_not_delay_exit(self):
+        slow = StubForecastServer('slow', delay=6)
+        fast = StubForecastServer('fast')
+        try:
+            script = ("from fauxsnow import ForecastAPILoader, AerisWeatherAdapter\n"
+                "loader = ForecastAPILoader([AerisWeatherAdapter('%s'), AerisWeatherAdapter('%s')])\n"
+                "loader.DEFAULT_HEDGE_SECONDS = 0.05\n"
+                "print(loader.fetch_periods('38.4', '-79.9')[0].weather)\n") % (slow.url, fast.url)
+            start = time.perf_counter()
+            output = subprocess.run([sys.executable, '-c', script], capture_output=True, text=True, timeout=10)
+            self.assertEqual(output.stdout.strip(), 'fast')
+            self.assertLess(time.perf_counter() - start, 4)
+        finally:
+            slow.close()
+            fast.close()
+
+    def test_hedge_percentile_from_environment(self):
+        old_value = os.environ.get('HEDGE_PERCENTILE')
+        try:
+            os.environ['HEDGE_PERCENTILE'] = '80'
+            self.assertEqual(ForecastAPILoader([]).hedge_percentile, 80)
+            for bad_value in ['p95', '150', '-1', 'nan']:
+                os.environ['HEDGE_PERCENTILE'] = bad_value
+                self.assertEqual(ForecastAPILoader([]).hedge_percentile, ForecastAPILoader.HEDGE_PERCENTILE)
+            self.assertEqual(ForecastAPILoader([], hedge_percentile=50).hedge_percentile, 50)
+        finally:
+            if old_value is None:
+                os.environ.pop('HEDGE_PERCENTILE', None)
+            else:
+                os.environ['HEDGE_PERCENTILE'] = old_value
+
+    def test_latencies_shared_across_loaders(self):
+        stub = StubForecastServer('fast')
+        try:
+            with ForecastAPILoader.latencies_lock:
+                del ForecastAPILoader.latencies[:]
+            ForecastAPILoader([AerisWeatherAdapter(stub.url)]).fetch_periods('38.4', '-79.9')
+            self.assertEqual(len(ForecastAPILoader([AerisWeatherAdapter(stub.url)]).latencies), 1)
+        finally:
+            stub.close()
+
+    def test_hedge_delay_uses_latency_percentile(self):
+        loader = ForecastAPILoader([], hedge_percentile=50)
+        self.assertEqual(loader.hedge_delay(), loader.DEFAULT_HEDGE_SECONDS)
+        loader.latencies = [0.1, 0.2, 0.3, 0.4, 0.5]
+        self.assertAlmostEqual(loader.hedge_delay(), 0.3)
+
+    def test_failed_resorts_keep_last_forecast(self):
+        resorts = ResortModel().get_all_resorts(False, self.TEST_SKI_RESORTS_FILE)[:2]
+        last_forecasts = ForecastModel().get_all_forecasts(self.TEST_FORECASTS_FILE)
+        stub = StubForecastServer('fresh', fail_on=resorts[0].lat)
+        try:
+            loader = ForecastAPILoader([AerisWeatherAdapter(stub.url)])
+            forecasts = loader.load_forecasts_from_api(resorts, last_forecasts)
+            self.assertEqual(len(forecasts), 2)
+            self.assertIs(forecasts[0], last_forecasts[0])
+            self.assertEqual(forecasts[1].periods[0].weather, 'fresh')
+
+            stub.status = 500
+            self.assertEqual(loader.load_forecasts_from_api(resorts, last_forecasts), [])
+        finally:
+            stub.close()
+
+    def test_build_rankings(self):
+        resorts = ResortModel().get_all_resorts(False, self.TEST_SKI_RESORTS_FILE)
+        model = ForecastModel()
+        forecasts = model.get_all_forecasts(self.TEST_FORECASTS_FILE)
+        rankings = model.build_rankings(forecasts, resorts)
+
+        self.assertEqual(len(rankings['days']), 7)
+        self.assertEqual(len(rankings['best_bets']), 7)
+        for day in rankings['days']:
+            self.assertEqual(len(day['resorts']), 17)
+            margins = [r['wet_bulb_margin'] for r in day['resorts']]
+            self.assertEqual(margins, sorted(margins, reverse=True))
+        for streak in rankings['streaks']:
+            self.assertGreaterEqual(streak['days'], model.MIN_STREAK_DAYS)
+        self.assertEqual(sum(s['resorts'] for s in rankings['states']), 17)
+        self.assertEqual(sum(s['faux_days'] for s in rankings['states']), 
+            sum(1 for f in forecasts for p in f.periods if p.conditions == 'Faux'))
+
+    def test_build_rankings_ignores_stale_days(self):
+        resorts = ResortModel().get_all_resorts(False, self.TEST_SKI_RESORTS_FILE)
+        model = ForecastModel()
+        forecasts = model.get_all_forecasts(self.TEST_FORECASTS_FILE)
+        current_days = [p.period_date for p in forecasts[1].periods]
+
+        # a resort that failed to update two days ago
+        stale = forecasts[0]
+        stale.forecast_date = '01/01/2020 08:00 AM'
+        for period, date in zip(stale.periods, ['Sat 1', 'Sun 2'] + current_days):
+            period.period_date = date
+
+        rankings = model.build_rankings(forecasts, resorts)
+        self.assertEqual([d['date'] for d in rankings['days']], current_days)
+        self.assertEqual([b['date'] for b in rankings['best_bets']], current_days)
+        for day in rankings['days']:
+            expected = 17 if day['date'] in current_days[:5] else 16
+            self.assertEqual(len(day['resorts']), expected)
+
+    def test_save_forecasts_saves_rankings(self):
+        tmp_dir = tempfile.mkdtemp()
+        try:
+            model = ForecastModel()
+            forecasts = model.get_all_forecasts(self.TEST_FORECASTS_FILE)
+            forecasts_file = os.path.join(tmp_dir, 'forecasts.json')
+            rankings_file = os.path.join(tmp_dir, 'rankings.json')
+            model.save_forecasts(forecasts, forecasts_file, rankings_file, self.TEST_SKI_RESORTS_FILE)
+            self.assertEqual(len(model.get_all_forecasts(forecasts_file)), 17)
+            rankings = model.get_rankings(rankings_file)
+            self.assertEqual(len(rankings['best_bets']), 7)
+        finally:
+            shutil.rmtree(tmp_dir)
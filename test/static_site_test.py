@@ -0,0 +1,57 @@
+import unittest, tempfile, shutil, os, gzip, json
+from static_site import build_static, build_static_page, static_page_file, STATIC_SITE_MANIFEST
+
+
+class TestStaticSite(unittest.TestCase):
+
+    def setUp(self):
+        self.output_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.output_dir)
+
+    def test_static_page_file(self):
+        self.assertEqual(static_page_file('/'), 'index.html')
+        self.assertEqual(static_page_file('/detail/snowshoe'), os.path.join('detail', 'snowshoe', 'index.html'))
+        self.assertEqual(static_page_file('/404'), '404.html')
+
+    def test_build_static(self):
+        rebuilt = build_static(self.output_dir, workers=2)
+        self.assertIn('/', rebuilt)
+        self.assertIn('/detail/snowshoe', rebuilt)
+
+        page = os.path.join(self.output_dir, 'detail', 'snowshoe', 'index.html')
+        with open(page, 'rb') as f:
+            html = f.read()
+        self.assertIn(b'Snowshoe', html)
+        with gzip.open(page + '.gz') as f:
+            self.assertEqual(f.read(), html)
+        self.assertTrue(os.path.exists(os.path.join(self.output_dir, 'static', 'favicon.svg')))
+
+        # nothing changed, so nothing is rendered again
+        self.assertEqual(build_static(self.output_dir, workers=2), [])
+        os.remove(page)
+        self.assertEqual(build_static(self.output_dir, workers=2), ['/detail/snowshoe'])
+
+    def test_build_static_page_rejects_errors(self):
+        with self.assertRaises(RuntimeError):
+            build_static_page('/detail/no-such-resort', self.output_dir)
+        self.assertFalse(os.path.exists(os.path.join(self.output_dir, 'detail')))
+
+    def test_build_static_removes_old_pages(self):
+        build_static(self.output_dir, workers=2)
+        old_page = os.path.join(self.output_dir, 'detail', 'closed-resort', 'index.html')
+        os.makedirs(os.path.dirname(old_page))
+        for variant in [old_page, old_page + '.gz']:
+            with open(variant, 'w') as f:
+                f.write('closed')
+        manifest_path = os.path.join(self.output_dir, STATIC_SITE_MANIFEST)
+        with open(manifest_path) as f:
+            manifest = json.load(f)
+        manifest['/detail/closed-resort'] = 'hash'
+        with open(manifest_path, 'w') as f:
+            json.dump(manifest, f)
+
+        self.assertEqual(build_static(self.output_dir, workers=2), [])
+        self.assertFalse(os.path.exists(os.path.dirname(old_page)))
+        self.assertTrue(os.path.exists(os.path.join(self.output_dir, 'detail', 'snowshoe', 'index.html')))
@@ -0,0 +1,68 @@
+from fauxsnow import ResortModel, ForecastAPILoader, ForecastModel, ForecastBroadcaster
+import json
+
+# page logic shared by the sync (app.py) and async (asgi.py) web apps. Each
+# page returns the template to render and its context, or None for a 404,
+# and each app registers PAGES with its own flavor of route handler.
+
+# one broadcaster per worker process, shared by every /events connection
+broadcaster = ForecastBroadcaster()
+KEEPALIVE_SECONDS = 15
+# comment line keeps proxies from closing an idle connection
+SSE_KEEPALIVE = ': keepalive\n\n'
+SSE_HEADERS = {'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+
+def welcome():
+    resort_model = ResortModel()
+    resorts = resort_model.get_all_resorts()
+    return "welcome.html", {'resorts': resorts}
+
+def detail(text_id):
+    resort_model = ResortModel()
+    resort = resort_model.get_resort_by_id(text_id)
+    if resort:
+        return "detail.html", {'resort': resort}
+    return None
+
+def refresh():
+    rm = ResortModel()
+    fm = ForecastModel()
+    resorts = rm.get_all_resorts()
+    fAPI = ForecastAPILoader()
+    forecasts = fAPI.load_forecasts_from_api(resorts, fm.get_all_forecasts())
+    # if the api call returns None, fail gracefully.
+    message = ''
+    if forecasts:
+        fm.save_forecasts(forecasts)
+        message = 'Updated forecasts'
+    else:
+        message = 'could not update forecasts'
+    return 'refresh.html', {'message': message}
+
+def rankings():
+    fm = ForecastModel()
+    return "rankings.html", {'rankings': fm.get_rankings(),
+        'min_streak_days': fm.MIN_STREAK_DAYS}
+
+def about():
+    rm = ResortModel()
+    resorts = rm.get_all_resorts()
+    num_resorts = len(resorts)
+    return "about.html", {'resorts': resorts, 'num_resorts': num_resorts}
+
+def sse_event(message):
+    """return a forecast message formatted as a server-sent event
+
+    Keyword arguments:
+    message -- a json-serializable dict
+    """
+    return 'event: forecast\ndata: ' + json.dumps(message, separators=(',', ':')) + '\n\n'
+
+# (url rule, page function); the function name is the url_for endpoint
+PAGES = [
+    ("/", welcome),
+    ("/detail/<text_id>", detail),
+    ("/refresh", refresh),
+    ("/rankings", rankings),
+    ("/about", about),
+]